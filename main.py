@@ -1,19 +1,165 @@
-from fastapi import FastAPI
+import asyncio
+import hashlib
+import re
+
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 # Create FastAPI app
-app = FastAPI(title="SurgeSentinel API")
+app = FastAPI(title="SurgeSentinel API", default_response_class=ORJSONResponse)
 
-# (Optional but useful) allow frontend to call backend
+# Allow the React (3000) and Streamlit (8501) frontends to call the backend.
+# Fixed lists keep the middleware on plain string matching, and no route needs cookies.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],      # later you can restrict this to ["http://localhost:3000"]
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=["http://localhost:3000", "http://localhost:8501"],
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
-# Simple health-check route
+# Simple health-check route (async so it runs on the event loop, not the threadpool)
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "SurgeSentinel backend is running 🎯"}
+
+# Placeholder data until database.py / ml_model.py are wired in
+DASHBOARD_DATA = {
+    "today_admissions": 145,
+    "occupancy_rate": 78,
+    "total_patients": 320,
+    "available_beds": 85
+}
+
+SURGE_PREDICTION = {
+    "predicted_patients": 67,
+    "confidence": 0.82,
+    "reasoning": "Increased patient inflow expected due to upcoming festival and current pollution levels (AQI: 156). Historical data shows 25% increase during similar conditions.",
+    "recommendations": {
+        "actions": [
+            {
+                "action": "Increase emergency department staff by 30%",
+                "priority": "high",
+                "category": "staffing",
+                "department": "Emergency",
+                "timeline": "Next 24 hours"
+            },
+            {
+                "action": "Prepare 15 additional beds in ICU",
+                "priority": "medium",
+                "category": "bed_management",
+                "department": "ICU",
+                "timeline": "Next 12 hours"
+            },
+            {
+                "action": "Stock additional respiratory medications",
+                "priority": "medium",
+                "category": "supplies",
+                "department": "Pharmacy",
+                "timeline": "Next 6 hours"
+            }
+        ]
+    }
+}
+
+BED_OCCUPANCY = [
+    {"department": "Emergency", "total_beds": 50, "occupied_beds": 42, "available_beds": 8, "occupancy_rate": 84},
+    {"department": "ICU", "total_beds": 30, "occupied_beds": 28, "available_beds": 2, "occupancy_rate": 93},
+    {"department": "General Ward", "total_beds": 150, "occupied_beds": 110, "available_beds": 40, "occupancy_rate": 73},
+    {"department": "Pediatrics", "total_beds": 40, "occupied_beds": 25, "available_beds": 15, "occupancy_rate": 62},
+    {"department": "Surgery", "total_beds": 60, "occupied_beds": 45, "available_beds": 15, "occupancy_rate": 75}
+]
+
+ENTITY_TAG_RE = re.compile(r'(?:W/)?"[^"]*"')
+
+def etag_matches(if_none_match, etag):
+    """
+    Weak comparison of an If-None-Match header against etag (RFC 9110):
+    "*" matches anything, otherwise any listed tag with the same opaque
+    value matches, whether or not either side carries the W/ prefix.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in ENTITY_TAG_RE.findall(if_none_match))
+
+def etag_response(request: Request, payload):
+    """
+    Serializes payload with an ETag header, or returns an empty 304
+    when the client's If-None-Match already matches it.
+    """
+    body = orjson.dumps(payload)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+def summarize_beds(rows):
+    """Hospital-wide bed totals, so clients don't re-aggregate the rows themselves."""
+    total_beds = sum(row["total_beds"] for row in rows)
+    occupied_beds = sum(row["occupied_beds"] for row in rows)
+    available_beds = sum(row["available_beds"] for row in rows)
+    return {
+        "total_beds": total_beds,
+        "occupied_beds": occupied_beds,
+        "available_beds": available_beds,
+        "occupancy_rate": round(occupied_beds / total_beds * 100, 1) if total_beds else 0.0,
+    }
+
+async def get_dashboard():
+    return DASHBOARD_DATA
+
+async def get_surge_prediction(hours_ahead: int = 24):
+    return SURGE_PREDICTION
+
+async def get_bed_occupancy():
+    return BED_OCCUPANCY
+
+# Everything the dashboard needs in one round-trip
+@app.get("/bootstrap")
+async def bootstrap(request: Request):
+    dashboard, surge, beds = await asyncio.gather(
+        get_dashboard(),
+        get_surge_prediction(),
+        get_bed_occupancy(),
+    )
+    # Totals ride along here only; the split /beds/occupancy/ keeps its plain list
+    return etag_response(request, {
+        "dashboard": dashboard,
+        "surge": surge,
+        "beds": {"rows": beds, "totals": summarize_beds(beds)},
+    })
+
+# Split routes kept for older clients; new code should use /bootstrap
+@app.get("/analytics/dashboard/", deprecated=True)
+async def analytics_dashboard():
+    return await get_dashboard()
+
+@app.get("/surge/predict/", deprecated=True)
+async def surge_predict(hours_ahead: int = 24):
+    return await get_surge_prediction(hours_ahead)
+
+@app.get("/beds/occupancy/", deprecated=True)
+async def beds_occupancy(request: Request):
+    return etag_response(request, await get_bed_occupancy())
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # "auto" picks uvloop + httptools when uvicorn[standard] installed them (uvloop
+    # isn't available on Windows); access logs are off since they dominate the cost
+    # of trivial endpoints like the health check.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        log_level="warning",
+        access_log=False,
+    )
@@ -1,11 +1,16 @@
 # streamlitapp.py
 
 import streamlit as st
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import html
 import json
 
 # Set page configuration
@@ -16,8 +21,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for styling
-st.markdown("""
+# Custom CSS for styling, injected by inject_css()
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -56,133 +61,355 @@ st.markdown("""
         border-left: 4px solid;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Recommendation styling by priority
+_PRIORITY_COLORS = {
+    'urgent': '#ef4444',
+    'high': '#f59e0b',
+    'medium': '#3b82f6',
+    'low': '#10b981'
+}
+
+_PRIORITY_ICONS = {
+    'urgent': '🚨',
+    'high': '⚠️',
+    'medium': '💡',
+    'low': 'ℹ️'
+}
+
+# Recommendation card markup, filled per action with str.format
+_REC_CARD_TMPL = """
+<div class="recommendation-card" style="border-left-color: {color}">
+    <div style="display: flex; justify-content: between; align-items: center;">
+        <h4>{icon} {action}</h4>
+        <span style="background: {color}; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem;">
+            {priority}
+        </span>
+    </div>
+    <p><strong>Department:</strong> {department} | <strong>Timeline:</strong> {timeline}</p>
+    <p><strong>Category:</strong> {category}</p>
+</div>
+"""
+
+# Department row in the bed management panel, with an inline progress bar
+_DEPT_ROW_TMPL = """
+<div style="margin-bottom: 1rem;">
+    <p><strong>{department}</strong></p>
+    <div style="display: flex; align-items: center; gap: 1rem;">
+        <div style="flex: 2; background: #e5e7eb; border-radius: 4px; height: 0.5rem;">
+            <div style="width: {pct}%; background: #667eea; border-radius: 4px; height: 100%;"></div>
+        </div>
+        <span style="flex: 1;">{occupied}/{total}</span>
+        <span style="flex: 1; color: {color};">{rate}%</span>
+    </div>
+</div>
+"""
 
 # API configuration
 API_BASE_URL = "http://localhost:8000"
+API_TIMEOUT = (1.0, 3.0)  # (connect, read) seconds
 
-# Mock data for demonstration (remove when backend is ready)
-def get_mock_dashboard_data():
-    return {
-        "today_admissions": 145,
-        "occupancy_rate": 78,
-        "total_patients": 320,
-        "available_beds": 85
+# Shared HTTP session so fetches reuse pooled keep-alive connections.
+# Cached as a resource because Streamlit re-executes this script on every rerun.
+@st.cache_resource
+def get_session():
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    ))
+    return session
+
+# Mock data for demonstration (remove when backend is ready).
+# Built once per script run (Streamlit re-executes this module on every rerun)
+# and shared by every get_mock_* call in that run, so nested sequences are
+# tuples to keep callers from mutating them.
+_MOCK_DASHBOARD = {
+    "today_admissions": 145,
+    "occupancy_rate": 78,
+    "total_patients": 320,
+    "available_beds": 85
+}
+
+_MOCK_SURGE = {
+    "predicted_patients": 67,
+    "confidence": 0.82,
+    "reasoning": "Increased patient inflow expected due to upcoming festival and current pollution levels (AQI: 156). Historical data shows 25% increase during similar conditions.",
+    "recommendations": {
+        "actions": (
+            {
+                "action": "Increase emergency department staff by 30%",
+                "priority": "high",
+                "category": "staffing",
+                "department": "Emergency",
+                "timeline": "Next 24 hours"
+            },
+            {
+                "action": "Prepare 15 additional beds in ICU",
+                "priority": "medium",
+                "category": "bed_management",
+                "department": "ICU",
+                "timeline": "Next 12 hours"
+            },
+            {
+                "action": "Stock additional respiratory medications",
+                "priority": "medium",
+                "category": "supplies",
+                "department": "Pharmacy",
+                "timeline": "Next 6 hours"
+            },
+        )
     }
+}
+
+_MOCK_BEDS = [
+    {"department": "Emergency", "total_beds": 50, "occupied_beds": 42, "available_beds": 8, "occupancy_rate": 84},
+    {"department": "ICU", "total_beds": 30, "occupied_beds": 28, "available_beds": 2, "occupancy_rate": 93},
+    {"department": "General Ward", "total_beds": 150, "occupied_beds": 110, "available_beds": 40, "occupancy_rate": 73},
+    {"department": "Pediatrics", "total_beds": 40, "occupied_beds": 25, "available_beds": 15, "occupancy_rate": 62},
+    {"department": "Surgery", "total_beds": 60, "occupied_beds": 45, "available_beds": 15, "occupancy_rate": 75}
+]
+
+def get_mock_dashboard_data():
+    return _MOCK_DASHBOARD
 
 def get_mock_surge_prediction():
+    return _MOCK_SURGE
+
+def get_mock_bed_occupancy():
+    return _MOCK_BEDS
+
+def parse_bed_occupancy(data):
+    """
+    Returns a list of department-level bed occupancy dicts.
+    Falls back to mock data if the payload has an unexpected
+    structure (like {"detail": "Not Found"}).
+    """
+    # Case 1: backend returns a dict that wraps the list
+    if isinstance(data, dict):
+        if "rows" in data and isinstance(data["rows"], list):
+            return data["rows"]
+        if "beds" in data and isinstance(data["beds"], list):
+            return data["beds"]
+        if "data" in data and isinstance(data["data"], list):
+            return data["data"]
+
+    # Case 2: backend directly returns a list
+    if isinstance(data, list):
+        return data
+
+    return get_mock_bed_occupancy()
+
+def parse_bed_totals(data):
+    """
+    Returns the backend's pre-aggregated bed totals, or None when the
+    payload doesn't carry them (older backends, mock data).
+    """
+    if isinstance(data, dict):
+        totals = data.get("totals")
+        if isinstance(totals, dict) and all(
+            key in totals for key in ("total_beds", "occupied_beds", "available_beds")
+        ):
+            return totals
+    return None
+
+def get_mock_bootstrap():
     return {
-        "predicted_patients": 67,
-        "confidence": 0.82,
-        "reasoning": "Increased patient inflow expected due to upcoming festival and current pollution levels (AQI: 156). Historical data shows 25% increase during similar conditions.",
-        "recommendations": {
-            "actions": [
-                {
-                    "action": "Increase emergency department staff by 30%",
-                    "priority": "high",
-                    "category": "staffing",
-                    "department": "Emergency",
-                    "timeline": "Next 24 hours"
-                },
-                {
-                    "action": "Prepare 15 additional beds in ICU",
-                    "priority": "medium",
-                    "category": "bed_management",
-                    "department": "ICU",
-                    "timeline": "Next 12 hours"
-                },
-                {
-                    "action": "Stock additional respiratory medications",
-                    "priority": "medium",
-                    "category": "supplies",
-                    "department": "Pharmacy",
-                    "timeline": "Next 6 hours"
-                }
-            ]
-        }
+        "dashboard": get_mock_dashboard_data(),
+        "surge": get_mock_surge_prediction(),
+        "beds": get_mock_bed_occupancy(),
+        "bed_totals": None,
+        "live": False
     }
 
-def get_mock_bed_occupancy():
-    return [
-        {"department": "Emergency", "total_beds": 50, "occupied_beds": 42, "available_beds": 8, "occupancy_rate": 84},
-        {"department": "ICU", "total_beds": 30, "occupied_beds": 28, "available_beds": 2, "occupancy_rate": 93},
-        {"department": "General Ward", "total_beds": 150, "occupied_beds": 110, "available_beds": 40, "occupancy_rate": 73},
-        {"department": "Pediatrics", "total_beds": 40, "occupied_beds": 25, "available_beds": 15, "occupancy_rate": 62},
-        {"department": "Surgery", "total_beds": 60, "occupied_beds": 45, "available_beds": 15, "occupancy_rate": 75}
-    ]
+# Last /bootstrap ETag and payload. Process-wide, like fetch_bootstrap's own cache,
+# so whichever session refreshes it can send If-None-Match.
+@st.cache_resource
+def get_etag_store():
+    return {}
 
 # Function to fetch data from API
 @st.cache_data(ttl=60)
-def fetch_dashboard_data():
-    try:
-        response = requests.get(f"{API_BASE_URL}/analytics/dashboard/")
-        if response.status_code == 200:
-            return response.json()
-        return get_mock_dashboard_data()
-    except Exception:
-        return get_mock_dashboard_data()
+def fetch_bootstrap():
+    """
+    Returns the dashboard, surge prediction and bed occupancy payloads
+    from a single /bootstrap round-trip. Any section the backend leaves
+    out falls back to its mock data. "live" is True only when the payload
+    came from the backend.
 
-@st.cache_data(ttl=60)
-def fetch_surge_prediction():
+    The last payload and its ETag are kept in get_etag_store(), so when
+    the backend answers 304 Not Modified the previous payload is reused
+    instead of downloading it again.
+    """
+    etag_store = get_etag_store()
+    cached = etag_store.get("bootstrap")
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
     try:
-        response = requests.get(f"{API_BASE_URL}/surge/predict/?hours_ahead=24")
+        response = get_session().get(f"{API_BASE_URL}/bootstrap", headers=headers, timeout=API_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached["payload"]
         if response.status_code == 200:
-            return response.json()
-        return get_mock_surge_prediction()
-    except Exception:
-        return get_mock_surge_prediction()
+            data = orjson.loads(response.content)
+            if isinstance(data, dict):
+                beds = parse_bed_occupancy(data.get("beds"))
+                # Backend totals only describe backend rows, not the mock fallback
+                bed_totals = (
+                    parse_bed_totals(data.get("beds"))
+                    if beds is not get_mock_bed_occupancy() else None
+                )
+                payload = {
+                    "dashboard": data.get("dashboard") or get_mock_dashboard_data(),
+                    "surge": data.get("surge") or get_mock_surge_prediction(),
+                    "beds": beds,
+                    "bed_totals": bed_totals,
+                    "live": True
+                }
+                etag = response.headers.get("ETag")
+                if etag:
+                    etag_store["bootstrap"] = {"etag": etag, "payload": payload}
+                return payload
+
+        # Non-200 or unexpected structure → mock
+        return get_mock_bootstrap()
+    except (requests.RequestException, orjson.JSONDecodeError):
+        return get_mock_bootstrap()
 
 @st.cache_data(ttl=60)
-def fetch_bed_occupancy():
+def get_bed_df(bed_occupancy, totals=None):
     """
-    Returns a list of department-level bed occupancy dicts.
-    Falls back to mock data if the backend is missing or returns
-    an unexpected structure (like {"detail": "Not Found"}).
+    Returns the bed occupancy as a DataFrame plus hospital-wide totals,
+    built once per fetch so reruns don't re-aggregate the rows in Python.
     """
-    try:
-        response = requests.get(f"{API_BASE_URL}/beds/occupancy/")
-        if response.status_code == 200:
-            data = response.json()
-
-            # Case 1: backend returns a dict that wraps the list
-            if isinstance(data, dict):
-                if "beds" in data and isinstance(data["beds"], list):
-                    return data["beds"]
-                if "data" in data and isinstance(data["data"], list):
-                    return data["data"]
+    # Extra safety: if something weird slipped through, fall back to mock
+    if not isinstance(bed_occupancy, list) or not bed_occupancy:
+        bed_occupancy = get_mock_bed_occupancy()
+        totals = None
 
-            # Case 2: backend directly returns a list
-            if isinstance(data, list):
-                return data
+    df = pd.DataFrame(bed_occupancy)
 
-        # Non-200 or unexpected structure → mock
-        return get_mock_bed_occupancy()
-    except Exception:
-        return get_mock_bed_occupancy()
+    # The backend pre-aggregates totals; only sum locally when it didn't (e.g. mock data)
+    if totals is None:
+        totals = {
+            column: int(value)
+            for column, value in df[["total_beds", "occupied_beds", "available_beds"]].sum().items()
+        }
+    if "occupancy_rate" not in totals:
+        total_beds = totals["total_beds"]
+        totals = {
+            **totals,
+            "occupancy_rate": totals["occupied_beds"] / total_beds * 100 if total_beds else 0.0
+        }
+    return df, totals
 
 # Function to send staff notifications
 def send_staff_notifications():
     try:
-        response = requests.post(f"{API_BASE_URL}/staff/notify/")
+        response = get_session().post(f"{API_BASE_URL}/staff/notify/", timeout=API_TIMEOUT)
         if response.status_code == 200:
             st.success("Staff notifications sent successfully!")
         else:
             st.error("Failed to send notifications")
-    except Exception:
+    except requests.RequestException:
         st.error("Error connecting to notification service")
 
+# Chart builders - cached on the (hashable) input rows so reruns reuse the figure.
+# Bed figures keep only a few snapshots, since each live refresh makes a new key.
+_DONUT_COLORS = px.colors.qualitative.Set3
+
+def bed_rows(bed_df):
+    """Returns (department, occupied_beds, available_beds) rows as a hashable tuple."""
+    return tuple(bed_df[['department', 'occupied_beds', 'available_beds']].itertuples(index=False, name=None))
+
+@st.cache_data(max_entries=4)
+def build_bed_bar_fig(rows):
+    departments, occupied, available = zip(*rows)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Occupied Beds',
+        x=departments,
+        y=occupied,
+        marker_color='#ef4444'
+    ))
+    fig.add_trace(go.Bar(
+        name='Available Beds',
+        x=departments,
+        y=available,
+        marker_color='#10b981'
+    ))
+    fig.update_layout(
+        barmode='stack',
+        height=400,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+@st.cache_data(max_entries=4)
+def build_bed_donut_fig(rows):
+    departments, occupied, _ = zip(*rows)
+    # go.Pie directly, skipping Plotly Express's DataFrame round-trip
+    return go.Figure(
+        data=[go.Pie(
+            labels=departments,
+            values=occupied,
+            hole=0.6,
+            marker=dict(colors=_DONUT_COLORS)
+        )],
+        layout=dict(height=400)
+    )
+
+@st.cache_data
+def build_surge_forecast_fig():
+    hours = np.arange(24)
+    # Mock prediction values - in real app, this would come from API
+    predictions = np.clip(50 + hours * 0.8 + (hours - 12) ** 2 * 0.2, 0, 100)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=hours,
+        y=predictions,
+        mode='lines+markers',
+        name='Predicted Patients',
+        line=dict(color='#667eea', width=3)
+    ))
+    fig.update_layout(
+        title="24-Hour Patient Surge Forecast",
+        xaxis_title="Hours from Now",
+        yaxis_title="Expected Patients",
+        height=400,
+        showlegend=True
+    )
+    return fig
+
+def inject_css():
+    # Streamlit drops elements that aren't re-emitted, so this has to run every rerun
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
 # Main app
 def main():
+    inject_css()
+
     # Header
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         st.markdown('<h1 class="main-header">🏥 SurgeSentinel</h1>', unsafe_allow_html=True)
         st.markdown("### AI-Powered Hospital Surge Management System")
     
-    # Fetch data
-    dashboard_data = fetch_dashboard_data()
-    surge_prediction = fetch_surge_prediction()
-    bed_occupancy = fetch_bed_occupancy()
+    # Fetch data (one round-trip for all three panels)
+    bootstrap = fetch_bootstrap()
+    dashboard_data = bootstrap["dashboard"]
+    surge_prediction = bootstrap["surge"]
+    bed_df, bed_totals = get_bed_df(bootstrap["beds"], bootstrap.get("bed_totals"))
+
+    # Tab fragments read their inputs from session state, so a fragment-scoped
+    # rerun can redraw one tab without re-running the fetches above
+    st.session_state["dashboard_data"] = dashboard_data
+    st.session_state["surge_prediction"] = surge_prediction
+    st.session_state["bed_df"] = bed_df
+    st.session_state["bed_totals"] = bed_totals
     
     # Sidebar
     with st.sidebar:
@@ -201,7 +428,7 @@ def main():
         
         st.markdown("---")
         st.subheader("System Status")
-        st.metric("API Status", "Connected" if dashboard_data != get_mock_dashboard_data() else "Demo Mode")
+        st.metric("API Status", "Connected" if bootstrap["live"] else "Demo Mode")
         st.metric("Last Updated", datetime.now().strftime("%H:%M:%S"))
         
         st.markdown("---")
@@ -211,18 +438,23 @@ def main():
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "🔮 Predictions", "🛏️ Bed Management", "💡 Recommendations"])
     
     with tab1:
-        display_overview(dashboard_data, surge_prediction, bed_occupancy)
+        display_overview()
     
     with tab2:
-        display_predictions(surge_prediction)
+        display_predictions()
     
     with tab3:
-        display_bed_management(bed_occupancy)
+        display_bed_management()
     
     with tab4:
-        display_recommendations(surge_prediction)
+        display_recommendations()
+
+@st.fragment
+def display_overview():
+    dashboard_data = st.session_state["dashboard_data"]
+    surge_prediction = st.session_state["surge_prediction"]
+    bed_df = st.session_state["bed_df"]
 
-def display_overview(dashboard_data, surge_prediction, bed_occupancy):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -259,33 +491,9 @@ def display_overview(dashboard_data, surge_prediction, bed_occupancy):
     
     with col1:
         st.subheader("Bed Occupancy by Department")
-
-        # Extra safety: if something weird slipped through, fall back to mock
-        if not isinstance(bed_occupancy, list) or not bed_occupancy:
-            bed_occupancy = get_mock_bed_occupancy()
         
         # Create bed occupancy chart
-        df_beds = pd.DataFrame(bed_occupancy)
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            name='Occupied Beds',
-            x=df_beds['department'],
-            y=df_beds['occupied_beds'],
-            marker_color='#ef4444'
-        ))
-        fig.add_trace(go.Bar(
-            name='Available Beds',
-            x=df_beds['department'],
-            y=df_beds['available_beds'],
-            marker_color='#10b981'
-        ))
-        fig.update_layout(
-            barmode='stack',
-            height=400,
-            showlegend=True,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
+        fig = build_bed_bar_fig(bed_rows(bed_df))
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -328,7 +536,10 @@ def display_overview(dashboard_data, surge_prediction, bed_occupancy):
         for factor, status in factors.items():
             st.write(f"• **{factor}:** {status}")
 
-def display_predictions(surge_prediction):
+@st.fragment
+def display_predictions():
+    surge_prediction = st.session_state["surge_prediction"]
+
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -340,25 +551,7 @@ def display_predictions(surge_prediction):
         
         # Prediction timeline
         st.subheader("Prediction Timeline")
-        hours = list(range(24))
-        # Mock prediction values - in real app, this would come from API
-        predictions = [max(0, min(100, 50 + i * 0.8 + (i-12)**2 * 0.2)) for i in hours]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=hours,
-            y=predictions,
-            mode='lines+markers',
-            name='Predicted Patients',
-            line=dict(color='#667eea', width=3)
-        ))
-        fig.update_layout(
-            title="24-Hour Patient Surge Forecast",
-            xaxis_title="Hours from Now",
-            yaxis_title="Expected Patients",
-            height=400,
-            showlegend=True
-        )
+        fig = build_surge_forecast_fig()
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -378,23 +571,23 @@ def display_predictions(surge_prediction):
                 st.progress(0.8 if rf['level'] == 'High' else 0.5 if rf['level'] == 'Medium' else 0.2)
                 st.write("")
 
-def display_bed_management(bed_occupancy):
+@st.fragment
+def display_bed_management():
+    bed_df = st.session_state["bed_df"]
+    bed_totals = st.session_state["bed_totals"]
+
     st.subheader("🛏️ Real-time Bed Management")
-    
-    # Ensure valid data
-    if not isinstance(bed_occupancy, list) or not bed_occupancy:
-        bed_occupancy = get_mock_bed_occupancy()
 
     # Create metrics row
-    total_beds = sum(dept['total_beds'] for dept in bed_occupancy)
-    occupied_beds = sum(dept['occupied_beds'] for dept in bed_occupancy)
-    available_beds = sum(dept['available_beds'] for dept in bed_occupancy)
+    total_beds = bed_totals['total_beds']
+    occupied_beds = bed_totals['occupied_beds']
+    available_beds = bed_totals['available_beds']
     
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Beds", total_beds)
     col2.metric("Occupied Beds", occupied_beds)
     col3.metric("Available Beds", available_beds)
-    col4.metric("Overall Occupancy", f"{(occupied_beds/total_beds)*100:.1f}%")
+    col4.metric("Overall Occupancy", f"{bed_totals['occupancy_rate']:.1f}%")
     
     st.markdown("---")
     
@@ -403,37 +596,31 @@ def display_bed_management(bed_occupancy):
     
     with col1:
         st.subheader("Department Overview")
-        for dept in bed_occupancy:
+        # All rows go out in one markdown element rather than a container + columns per department
+        rows = []
+        for dept in bed_df.to_dict('records'):
             occupancy_rate = dept['occupancy_rate']
-            with st.container():
-                st.write(f"**{dept['department']}**")
-                col_a, col_b, col_c = st.columns([2, 1, 1])
-                with col_a:
-                    st.progress(occupancy_rate/100)
-                with col_b:
-                    st.write(f"{dept['occupied_beds']}/{dept['total_beds']}")
-                with col_c:
-                    color = "red" if occupancy_rate > 90 else "orange" if occupancy_rate > 75 else "green"
-                    st.markdown(f"<span style='color: {color};'>{occupancy_rate}%</span>", unsafe_allow_html=True)
-                st.write("")
+            rows.append(_DEPT_ROW_TMPL.format(
+                department=html.escape(str(dept['department'])),
+                pct=min(max(occupancy_rate, 0), 100),
+                occupied=html.escape(str(dept['occupied_beds'])),
+                total=html.escape(str(dept['total_beds'])),
+                color="red" if occupancy_rate > 90 else "orange" if occupancy_rate > 75 else "green",
+                rate=html.escape(str(occupancy_rate))
+            ))
+        st.markdown("\n".join(rows), unsafe_allow_html=True)
     
     with col2:
         st.subheader("Occupancy Distribution")
         
         # Create donut chart
-        labels = [dept['department'] for dept in bed_occupancy]
-        values = [dept['occupied_beds'] for dept in bed_occupancy]
-        
-        fig = px.pie(
-            names=labels,
-            values=values,
-            hole=0.6,
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_layout(height=400)
+        fig = build_bed_donut_fig(bed_rows(bed_df))
         st.plotly_chart(fig, use_container_width=True)
 
-def display_recommendations(surge_prediction):
+@st.fragment
+def display_recommendations():
+    surge_prediction = st.session_state["surge_prediction"]
+
     st.subheader("💡 AI-Powered Recommendations")
     
     recommendations = surge_prediction.get('recommendations', {}).get('actions', [])
@@ -442,35 +629,22 @@ def display_recommendations(surge_prediction):
         st.info("No urgent recommendations at this time. System is operating normally.")
         return
     
-    for i, action in enumerate(recommendations):
-        priority = action.get('priority', 'medium')
-        priority_colors = {
-            'urgent': '#ef4444',
-            'high': '#f59e0b',
-            'medium': '#3b82f6',
-            'low': '#10b981'
-        }
-        
-        priority_icons = {
-            'urgent': '🚨',
-            'high': '⚠️',
-            'medium': '💡',
-            'low': 'ℹ️'
-        }
-        
-        with st.container():
-            st.markdown(f"""
-            <div class="recommendation-card" style="border-left-color: {priority_colors.get(priority, '#3b82f6')}">
-                <div style="display: flex; justify-content: between; align-items: center;">
-                    <h4>{priority_icons.get(priority, '💡')} {action.get('action', '')}</h4>
-                    <span style="background: {priority_colors.get(priority, '#3b82f6')}; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem;">
-                        {priority.upper()}
-                    </span>
-                </div>
-                <p><strong>Department:</strong> {action.get('department', 'All')} | <strong>Timeline:</strong> {action.get('timeline', 'ASAP')}</p>
-                <p><strong>Category:</strong> {action.get('category', 'General').replace('_', ' ').title()}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    cards = []
+    for action in recommendations:
+        # `or` rather than .get() defaults, so JSON nulls also fall back
+        priority = str(action.get('priority') or 'medium')
+        cards.append(_REC_CARD_TMPL.format(
+            color=_PRIORITY_COLORS.get(priority, '#3b82f6'),
+            icon=_PRIORITY_ICONS.get(priority, '💡'),
+            action=html.escape(str(action.get('action') or '')),
+            priority=html.escape(priority.upper()),
+            department=html.escape(str(action.get('department') or 'All')),
+            timeline=html.escape(str(action.get('timeline') or 'ASAP')),
+            category=html.escape(str(action.get('category') or 'General').replace('_', ' ').title())
+        ))
+
+    # One markdown element for every card instead of a container per recommendation
+    st.markdown("\n".join(cards), unsafe_allow_html=True)
     
     st.markdown("---")
     